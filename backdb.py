@@ -1,17 +1,35 @@
+import asyncio
 import duckdb
+import io
 import json
 import logging
-
-import ollama
-from fastapi import FastAPI, HTTPException
+import os
+import threading
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
 from datetime import datetime
 from fastapi.middleware.cors import CORSMiddleware
 
+import llm_backend
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app):
+    # 建表放在启动钩子里执行，导入模块时不再访问数据库；
+    # 多 worker 时会等待写锁，放到线程里执行以免阻塞事件循环
+    await asyncio.to_thread(run_migrations)
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 
 # 配置 CORS
 app.add_middleware(
@@ -22,11 +40,78 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 数据库路径，多进程部署时所有 worker 共享同一个文件
+DB_PATH = os.environ.get("STUDYPLAN_DB", "file.db")
 
-# 创建 DuckDB 数据库表
-def create_tables():
-    with duckdb.connect('file.db') as con:
-        con.execute("""
+try:
+    import fcntl
+except ImportError:  # Windows: 没有 fcntl，只支持单进程运行
+    fcntl = None
+
+
+# 没有 fcntl 时（Windows 单进程）用进程内的读写锁代替锁文件：读请求可以并发，写请求独占
+_local_lock_cond = threading.Condition()
+_local_lock_state = {"readers": 0, "writer": False}
+
+
+@contextmanager
+def _local_db_lock(exclusive):
+    with _local_lock_cond:
+        if exclusive:
+            _local_lock_cond.wait_for(lambda: not _local_lock_state["writer"] and _local_lock_state["readers"] == 0)
+            _local_lock_state["writer"] = True
+        else:
+            _local_lock_cond.wait_for(lambda: not _local_lock_state["writer"])
+            _local_lock_state["readers"] += 1
+    try:
+        yield
+    finally:
+        with _local_lock_cond:
+            if exclusive:
+                _local_lock_state["writer"] = False
+            else:
+                _local_lock_state["readers"] -= 1
+            _local_lock_cond.notify_all()
+
+
+# DuckDB 同一时间只允许一个进程以读写方式打开数据库文件，多个进程只读打开也不能和写者共存。
+# 这里用一个锁文件在进程间协调：读请求持有共享锁并以只读方式连接，
+# 写请求持有排他锁，所有 worker 的写操作因此被串行化为单写者，而不是直接报锁冲突。
+@contextmanager
+def _db_lock(db_path, exclusive):
+    if fcntl is None:
+        with _local_db_lock(exclusive):
+            yield
+        return
+    with open(db_path + ".lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@contextmanager
+def db_read(db_path=None):
+    db_path = db_path or DB_PATH
+    with _db_lock(db_path, exclusive=False):
+        # 同一进程内 DuckDB 不允许只读和读写连接混用，没有 fcntl 时读请求也用读写连接
+        with duckdb.connect(db_path, read_only=fcntl is not None) as con:
+            yield con
+
+
+@contextmanager
+def db_write(db_path=None):
+    db_path = db_path or DB_PATH
+    with _db_lock(db_path, exclusive=True):
+        with duckdb.connect(db_path) as con:
+            yield con
+
+
+# 数据库迁移，按版本号顺序执行；已执行的版本记录在 schema_migrations 表中，重复启动不会重复执行
+MIGRATIONS = [
+    (1, "create_initial_tables", [
+        """
         CREATE TABLE IF NOT EXISTS teaching_plan (
             plan_id VARCHAR PRIMARY KEY,
             title TEXT,
@@ -36,9 +121,8 @@ def create_tables():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
-        """)
-
-        con.execute("""
+        """,
+        """
         CREATE TABLE IF NOT EXISTS task (
             plan_id VARCHAR,
             task_id VARCHAR,
@@ -50,19 +134,44 @@ def create_tables():
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             PRIMARY KEY (plan_id, task_id)
         )
-        """)
-
-        con.execute("""
+        """,
+        """
         CREATE TABLE IF NOT EXISTS operation_history (
             plan_id VARCHAR,
             operation_type VARCHAR,
             details JSON,
             timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
-        """)
+        """,
+    ]),
+]
 
 
-create_tables()
+def run_migrations():
+    with db_write() as con:
+        con.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        applied = {row[0] for row in con.execute("SELECT version FROM schema_migrations").fetchall()}
+
+        for version, name, statements in MIGRATIONS:
+            if version in applied:
+                continue
+            # 每个迁移和它的版本记录放在同一个事务里，失败时整体回滚，下次启动重新执行
+            con.begin()
+            try:
+                for statement in statements:
+                    con.execute(statement)
+                con.execute("INSERT INTO schema_migrations (version, name) VALUES (?, ?)", (version, name))
+                con.commit()
+            except Exception:
+                con.rollback()
+                raise
+            logging.info(f"Applied migration {version}: {name}")
 
 
 # Pydantic models for request validation
@@ -113,7 +222,7 @@ class NewTask(BaseModel):
 
 # Log operations
 def log_operation(plan_id, operation_type, details):
-    with duckdb.connect('file.db') as con:
+    with db_write() as con:
         try:
             con.execute(
                 "INSERT INTO operation_history (plan_id, operation_type, details, timestamp) VALUES (?, ?, ?, CURRENT_TIMESTAMP)",
@@ -135,7 +244,7 @@ def extract_task_content(md_content, task_id):
 @app.get("/get_operation_history/{plan_id}")
 def get_operation_history(plan_id: str):
     try:
-        with duckdb.connect('file.db') as con:
+        with db_read() as con:
             if plan_id == "all":
                 # Fetch operation history for all plans
                 result = con.execute(
@@ -164,7 +273,7 @@ def get_operation_history(plan_id: str):
 @app.post("/add_plan")
 def add_plan(new_plan: NewPlanJSON):
     try:
-        with duckdb.connect('file.db') as con:
+        with db_write() as con:
             con.execute("""
                 INSERT INTO teaching_plan (plan_id, title, goal, weeks, resources, created_at, updated_at) 
                 VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
@@ -186,7 +295,7 @@ def add_plan(new_plan: NewPlanJSON):
 @app.get("/get_plan/{plan_id}")
 def get_plan(plan_id: str):
     try:
-        with duckdb.connect('file.db') as con:
+        with db_read() as con:
             plan_result = con.execute("SELECT title, goal, weeks, resources FROM teaching_plan WHERE plan_id = ?",
                                       (plan_id,)).fetchone()
             if not plan_result:
@@ -241,7 +350,7 @@ def get_plan(plan_id: str):
 @app.delete("/delete_plan/{plan_id}")
 def delete_plan(plan_id: str):
     try:
-        with duckdb.connect('file.db') as con:
+        with db_write() as con:
             existing_plan = con.execute("SELECT 1 FROM teaching_plan WHERE plan_id = ?", (plan_id,)).fetchone()
             if not existing_plan:
                 raise HTTPException(status_code=404, detail="Plan not found")
@@ -259,7 +368,7 @@ def delete_plan(plan_id: str):
 @app.get("/api/weeks/{week_number}")
 def get_week_tasks(week_number: int):
     try:
-        with duckdb.connect('file.db') as con:
+        with db_read() as con:
             # 查询所有计划中包含的周数据
             plans_result = con.execute("SELECT plan_id, title, weeks FROM teaching_plan").fetchall()
 
@@ -321,7 +430,7 @@ def get_week_tasks(week_number: int):
 @app.post("/add_task")
 def add_task(new_task: NewTask):
     try:
-        with duckdb.connect('file.db') as con:
+        with db_write() as con:
             # Retrieve the existing 'weeks' JSON structure
             plan_result = con.execute("SELECT weeks FROM teaching_plan WHERE plan_id = ?",
                                       (new_task.plan_id,)).fetchone()
@@ -381,7 +490,7 @@ def add_task(new_task: NewTask):
 @app.delete("/delete_task/{plan_id}/{task_id}")
 def delete_task(plan_id: str, task_id: str):
     try:
-        with duckdb.connect('file.db') as con:
+        with db_write() as con:
             # Retrieve the existing 'weeks' JSON structure
             plan_result = con.execute("SELECT weeks FROM teaching_plan WHERE plan_id = ?",
                                       (plan_id,)).fetchone()
@@ -432,7 +541,7 @@ def delete_task(plan_id: str, task_id: str):
 @app.get("/get_plans")
 def get_plans():
     try:
-        with duckdb.connect('file.db') as con:
+        with db_read() as con:
             result = con.execute("SELECT plan_id, title FROM teaching_plan").fetchall()
         plans = [{"plan_id": row[0], "title": row[1]} for row in result]
         return {"plans": plans}
@@ -444,7 +553,7 @@ def get_plans():
 @app.post("/submit_comment")
 def submit_comment(comment: Comment):
     try:
-        with duckdb.connect('file.db') as con:
+        with db_write() as con:
             # Retrieve the existing 'weeks' JSON structure
             plan_result = con.execute("SELECT weeks FROM teaching_plan WHERE plan_id = ?",
                                       (comment.plan_id,)).fetchone()
@@ -496,47 +605,65 @@ def submit_comment(comment: Comment):
 @app.post("/get_feedback")
 def get_feedback(feedback_request: FeedbackRequest):
     try:
-        with duckdb.connect('file.db') as con:
+        # 只读阶段：生成反馈可能需要很久，不能在此期间占着写锁
+        with db_read() as con:
             # Retrieve the teaching plan's JSON data
             plan_result = con.execute("SELECT title, goal, weeks FROM teaching_plan WHERE plan_id = ?",
                                       (feedback_request.plan_id,)).fetchone()
-            if not plan_result:
-                raise HTTPException(status_code=404, detail="Plan not found")
-
-            # Convert the weeks JSON string to a Python dictionary
-            weeks = json.loads(plan_result[2])
-
-            # Locate the specific task to generate feedback
-            task_content = None
-            for week in weeks:
-                for day in week["days"]:
-                    for task in day["tasks"]:
-                        if task["task_id"] == feedback_request.task_id:
-                            task_content = task["content"]
-                            break
-                    if task_content:
+        if not plan_result:
+            raise HTTPException(status_code=404, detail="Plan not found")
+
+        # Convert the weeks JSON string to a Python dictionary
+        weeks = json.loads(plan_result[2])
+
+        # Locate the specific task to generate feedback
+        task_content = None
+        for week in weeks:
+            for day in week["days"]:
+                for task in day["tasks"]:
+                    if task["task_id"] == feedback_request.task_id:
+                        task_content = task["content"]
                         break
                 if task_content:
                     break
+            if task_content:
+                break
+
+        if not task_content:
+            raise HTTPException(status_code=404,
+                                detail=f"Task content not found for task_id: {feedback_request.task_id}")
+
+        # Call the AI model to generate feedback
+        feedback, leader = llm_backend.get_backend().generate([
+            {
+                "role": "user",
+                "content": (
+                    f"现在你是一个教授编程开发的高级教师，现在我给你一份学习计划数据: {json.dumps({'title': plan_result[0], 'goal': plan_result[1], 'weeks': weeks}, ensure_ascii=False)}，"
+                    f"这是我感到疑问的任务点: {task_content}，然后这是我的评论: {feedback_request.comment}，"
+                    "现在我希望你能给我合适的建议来帮助我更好的学习,具体建议内容请包裹在&&&{{code}}&&&中发给我。"
+                )
+            }
+        ])
+
+        # 相同请求被合并时只由实际生成的那个请求把反馈写入任务；
+        # 其余请求仍各自记录一条 get_feedback 操作（标记 coalesced），统计接口按请求次数计数
+        if not leader:
+            log_operation(feedback_request.plan_id, "get_feedback", {
+                "task_id": feedback_request.task_id,
+                "feedback": feedback,
+                "coalesced": True,
+                "timestamp": datetime.utcnow().isoformat()
+            })
+            return {"feedback": feedback}
+
+        with db_write() as con:
+            # 生成期间其他 worker 可能已修改计划，重新读取最新的 'weeks' 再追加
+            plan_result = con.execute("SELECT weeks FROM teaching_plan WHERE plan_id = ?",
+                                      (feedback_request.plan_id,)).fetchone()
+            if not plan_result:
+                raise HTTPException(status_code=404, detail="Plan not found")
 
-            if not task_content:
-                raise HTTPException(status_code=404,
-                                    detail=f"Task content not found for task_id: {feedback_request.task_id}")
-
-            # Call the AI model to generate feedback
-            response = ollama.chat(model='llama3.1', messages=[
-                {
-                    "role": "user",
-                    "content": (
-                        f"现在你是一个教授编程开发的高级教师，现在我给你一份学习计划数据: {json.dumps({'title': plan_result[0], 'goal': plan_result[1], 'weeks': weeks}, ensure_ascii=False)}，"
-                        f"这是我感到疑问的任务点: {task_content}，然后这是我的评论: {feedback_request.comment}，"
-                        "现在我希望你能给我合适的建议来帮助我更好的学习,具体建议内容请包裹在&&&{{code}}&&&中发给我。"
-                    )
-                }
-            ])
-
-            # Extract the feedback from the AI response
-            feedback = response['message']['content']
+            weeks = json.loads(plan_result[0])
 
             # Append the new feedback to the task
             feedbacks_appended = False
@@ -555,6 +682,10 @@ def get_feedback(feedback_request: FeedbackRequest):
                 if feedbacks_appended:
                     break
 
+            # 生成期间任务可能已被其他请求删除，这时不能当作成功返回
+            if not feedbacks_appended:
+                raise HTTPException(status_code=404, detail="Task not found in plan")
+
             # Update the 'weeks' structure in the database
             con.execute("""
                 UPDATE teaching_plan 
@@ -570,6 +701,11 @@ def get_feedback(feedback_request: FeedbackRequest):
 
         return {"feedback": feedback}
 
+    except HTTPException:
+        raise
+    except llm_backend.LLMTimeoutError as e:
+        logging.error(f"Failed to get feedback: {e}")
+        raise HTTPException(status_code=504, detail="AI feedback timed out, please try again later")
     except Exception as e:
         logging.error(f"Failed to get feedback: {e}")
         raise HTTPException(status_code=500, detail="Failed to get feedback")
@@ -578,7 +714,7 @@ def get_feedback(feedback_request: FeedbackRequest):
 @app.put("/update_task_status")
 def update_task_status(update_request: TaskStatusUpdate):
     try:
-        with duckdb.connect('file.db') as con:
+        with db_write() as con:
             # Retrieve the existing 'weeks' JSON structure
             plan_result = con.execute("SELECT weeks FROM teaching_plan WHERE plan_id = ?",
                                       (update_request.plan_id,)).fetchone()
@@ -640,7 +776,7 @@ def serialize_datetime(obj):
 def export_db_to_json(db_path, output_file):
     try:
         # Connect to the DuckDB database
-        with duckdb.connect(db_path) as con:
+        with db_read(db_path) as con:
             # Get the list of tables
             tables = con.execute("SHOW TABLES").fetchall()
 
@@ -669,13 +805,10 @@ def export_db_to_json(db_path, output_file):
         print(f"Failed to export database: {e}")
 
 
-export_db_to_json('file.db', 'db_export.json')
-
-
 @app.post("/edit_task")
 def edit_task(edit_request: EditTask):
     try:
-        with duckdb.connect('file.db') as con:
+        with db_write() as con:
             # Retrieve the existing 'weeks' JSON structure
             plan_result = con.execute("SELECT weeks FROM teaching_plan WHERE plan_id = ?",
                                       (edit_request.plan_id,)).fetchone()
@@ -727,8 +860,195 @@ def edit_task(edit_request: EditTask):
         raise HTTPException(status_code=500, detail="Failed to edit task")
 
 
+# ---------------- 统计分析接口 ----------------
+# 直接在 DuckDB 里对计划数据和 operation_history 做聚合，不再需要先导出 db_export.json。
+# 通过 format 参数可以返回 json、arrow（Arrow IPC stream）或 parquet，方便报表工具直接读取。
+
+ANALYTICS_MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+ANALYTICS_INTERVALS = ("day", "week", "month")
+
+# 流式导出时每个 record batch 的行数
+ANALYTICS_BATCH_ROWS = 65536
+
+# 把 teaching_plan.weeks 展开成 (plan_id, week) 和 (plan_id, week, task) 两组行。
+# unnest 空数组不产生行，没有任务的周只出现在 plan_week_numbers 中，统计时需从它 LEFT JOIN
+PLAN_TASKS_CTE = """
+WITH plan_weeks AS (
+    SELECT plan_id, unnest(json_extract(weeks, '$[*]')) AS week
+    FROM teaching_plan
+    WHERE ? IS NULL OR plan_id = ?
+), plan_week_numbers AS (
+    SELECT plan_id, CAST(week->>'week' AS INTEGER) AS week, week AS week_data
+    FROM plan_weeks
+), plan_days AS (
+    SELECT plan_id, week, unnest(json_extract(week_data, '$.days[*]')) AS day
+    FROM plan_week_numbers
+), plan_tasks AS (
+    SELECT plan_id, week, unnest(json_extract(day, '$.tasks[*]')) AS task
+    FROM plan_days
+)
+"""
+
+
+# 只记录写入的字节并跟踪总偏移量；parquet 写入时依赖 tell() 计算元数据中的偏移
+class _ChunkSink(io.RawIOBase):
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _stream_batches(stack, reader, fmt):
+    # 边从 DuckDB 读取 record batch 边编码发送，整个结果不会在内存里拼成一份
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    with stack:
+        sink = _ChunkSink()
+        if fmt == "arrow":
+            writer = pa.ipc.new_stream(sink, reader.schema)
+        else:
+            writer = pq.ParquetWriter(sink, reader.schema)
+        with writer:
+            for batch in reader:
+                if fmt == "arrow":
+                    writer.write_batch(batch)
+                else:
+                    writer.write_batch(batch, row_group_size=batch.num_rows)
+                yield sink.drain()
+        yield sink.drain()
+
+
+def analytics_response(name, query, params, fmt):
+    if fmt != "json" and fmt not in ANALYTICS_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {fmt}")
+
+    if fmt == "json":
+        with db_read() as con:
+            cursor = con.execute(query, params)
+            columns = [column[0] for column in cursor.description]
+            return {name: [dict(zip(columns, row)) for row in cursor.fetchall()]}
+
+    # 连接和读锁一直保持到响应发送完毕，由 _stream_batches 结束时释放；
+    # 响应没有开始发送（例如客户端提前断开）时由后台任务兜底释放
+    with ExitStack() as stack:
+        con = stack.enter_context(db_read())
+        cursor = con.execute(query, params)
+        # DuckDB 1.5 起 fetch_record_batch 改名为 to_arrow_reader
+        fetch_reader = getattr(cursor, "to_arrow_reader", None) or cursor.fetch_record_batch
+        reader = fetch_reader(ANALYTICS_BATCH_ROWS)
+        stack = stack.pop_all()
+
+    return StreamingResponse(_stream_batches(stack, reader, fmt), media_type=ANALYTICS_MEDIA_TYPES[fmt],
+                             headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+                             background=BackgroundTask(stack.close))
+
+
+@app.get("/analytics/task_completion")
+def analytics_task_completion(plan_id: Optional[str] = None, fmt: str = Query("json", alias="format")):
+    # 每个计划每周的任务总数和已完成数
+    try:
+        return analytics_response("task_completion", PLAN_TASKS_CTE + """
+            SELECT w.plan_id, w.week,
+                   count(t.task) AS total_tasks,
+                   count(t.task) FILTER (WHERE t.task->>'status' = 'Completed') AS completed_tasks
+            FROM (SELECT DISTINCT plan_id, week FROM plan_week_numbers) AS w
+            LEFT JOIN plan_tasks AS t ON t.plan_id = w.plan_id AND t.week = w.week
+            GROUP BY w.plan_id, w.week
+            ORDER BY w.plan_id, w.week
+        """, (plan_id, plan_id), fmt)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Failed to compute task completion: {e}")
+        raise HTTPException(status_code=500, detail="Failed to compute task completion")
+
+
+@app.get("/analytics/comment_volume")
+def analytics_comment_volume(plan_id: Optional[str] = None, interval: str = "day",
+                             fmt: str = Query("json", alias="format")):
+    # 按时间段统计评论数量
+    if interval not in ANALYTICS_INTERVALS:
+        raise HTTPException(status_code=400, detail=f"interval must be one of {', '.join(ANALYTICS_INTERVALS)}")
+    try:
+        return analytics_response("comment_volume", """
+            SELECT plan_id, date_trunc(?, timestamp) AS period, count(*) AS comments
+            FROM operation_history
+            WHERE operation_type = 'submit_comment' AND (? IS NULL OR plan_id = ?)
+            GROUP BY plan_id, period
+            ORDER BY period, plan_id
+        """, (interval, plan_id, plan_id), fmt)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Failed to compute comment volume: {e}")
+        raise HTTPException(status_code=500, detail="Failed to compute comment volume")
+
+
+@app.get("/analytics/feedback_requests")
+def analytics_feedback_requests(plan_id: Optional[str] = None, fmt: str = Query("json", alias="format")):
+    # 每个任务请求 AI 反馈的次数
+    try:
+        return analytics_response("feedback_requests", """
+            SELECT plan_id, details->>'task_id' AS task_id,
+                   count(*) AS feedback_requests,
+                   max(timestamp) AS last_requested_at
+            FROM operation_history
+            WHERE operation_type = 'get_feedback' AND (? IS NULL OR plan_id = ?)
+            GROUP BY plan_id, task_id
+            ORDER BY feedback_requests DESC, plan_id, task_id
+        """, (plan_id, plan_id), fmt)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Failed to compute feedback requests: {e}")
+        raise HTTPException(status_code=500, detail="Failed to compute feedback requests")
+
+
 # 启动 FastAPI 应用
+# 开发:  python backdb.py                （单进程，自动重载）
+# 生产:  python backdb.py --workers 4    （多进程，不重载，写操作经锁文件串行化）
 if __name__ == "__main__":
+    import argparse
+
     import uvicorn
 
-    uvicorn.run("backdb:app", host="127.0.0.1", port=8000, reload=True)
+    parser = argparse.ArgumentParser(description="studyPlan 后端服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="worker 进程数；大于 0 时以生产模式运行（关闭 reload）")
+    parser.add_argument("--export", metavar="OUTPUT_FILE",
+                        help="把数据库导出为 JSON 文件后退出，不启动服务")
+    args = parser.parse_args()
+
+    if args.export:
+        export_db_to_json(DB_PATH, args.export)
+        raise SystemExit(0)
+
+    if args.workers > 0:
+        if args.workers > 1 and fcntl is None:
+            parser.error("当前平台不支持多 worker 部署（缺少 fcntl）")
+        uvicorn.run("backdb:app", host=args.host, port=args.port, workers=args.workers)
+    else:
+        uvicorn.run("backdb:app", host=args.host, port=args.port, reload=True)
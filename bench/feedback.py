@@ -0,0 +1,43 @@
+"""LLM 后端基准：相同请求合并与并发上限的效果。
+
+用法（在仓库根目录）:
+    python bench/feedback.py --clients 20 --delay 0.5
+
+使用进程内的 FakeBackend，每次生成固定耗时 --delay 秒，不需要启动模型服务。
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_backend import FakeBackend  # noqa: E402
+
+
+def run(backend, prompts):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(len(prompts)) as pool:
+        list(pool.map(backend.chat, prompts))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, default=2)
+    args = parser.parse_args()
+
+    same = [[{"role": "user", "content": "same question"}]] * args.clients
+    distinct = [[{"role": "user", "content": f"question {i}"}] for i in range(args.clients)]
+
+    for label, prompts in (("identical prompts", same), ("distinct prompts", distinct)):
+        backend = FakeBackend(delay=args.delay, max_concurrency=args.concurrency)
+        elapsed = run(backend, prompts)
+        print(f"{label:18} clients={args.clients} generations={backend.calls} wall={elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
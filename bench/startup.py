@@ -0,0 +1,82 @@
+"""冷启动基准：从启动进程到第一个请求成功返回的时间。
+
+用法（在仓库根目录）:
+    python bench/startup.py --runs 5
+
+每轮都在临时目录里用全新的数据库启动一次 uvicorn，轮询 /get_plans 直到返回 200。
+同时单独测量 `import backdb` 的耗时，用来区分导入开销和服务启动开销。
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_import(workdir):
+    code = "import time; t = time.perf_counter(); import backdb; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=workdir, env=_env(workdir),
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def measure_first_request(workdir, timeout=30.0):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/get_plans"
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "backdb:app", "--port", str(port),
+                             "--log-level", "warning"],
+                            cwd=workdir, env=_env(workdir),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError(f"server did not answer {url} within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def _env(workdir):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    env["STUDYPLAN_DB"] = os.path.join(workdir, "file.db")
+    return env
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    imports, first_requests = [], []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as workdir:
+            imports.append(measure_import(workdir))
+        with tempfile.TemporaryDirectory() as workdir:
+            first_requests.append(measure_first_request(workdir))
+
+    print(f"runs: {args.runs}")
+    print(f"import backdb:          median {statistics.median(imports) * 1000:.0f} ms")
+    print(f"start -> first request: median {statistics.median(first_requests) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
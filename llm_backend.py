@@ -0,0 +1,149 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+
+# 等待生成超时（排队等并发名额或等待合并的请求），调用方应返回 503/504 而不是一直占着线程
+class LLMTimeoutError(TimeoutError):
+    pass
+
+
+# 合并进来的请求在截止时间之后再多等的秒数
+FOLLOWER_GRACE = 1.0
+
+
+# LLM 后端基类：限制同时进行的生成数量，并合并相同的请求。
+# 一个班级同时对同一个任务点"问 AI"时，只会真正生成一次，其余请求等待并共享结果。
+class LLMBackend:
+    def __init__(self, max_concurrency=2, timeout=120.0):
+        self.timeout = timeout
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._inflight = {}  # 请求内容 -> (Future, 截止时间)
+
+    def chat(self, messages):
+        return self.generate(messages)[0]
+
+    # 返回 (内容, 是否为实际执行生成的请求)；合并进来的请求得到的第二项为 False
+    def generate(self, messages):
+        key = json.dumps(messages, sort_keys=True, ensure_ascii=False)
+        with self._lock:
+            inflight = self._inflight.get(key)
+            leader = inflight is None
+            if leader:
+                # 排队等名额和生成共用一个截止时间，合并进来的请求也等到同一个截止时间
+                inflight = (Future(), time.monotonic() + self.timeout)
+                self._inflight[key] = inflight
+        future, deadline = inflight
+
+        if not leader:
+            logging.info("Joining in-flight LLM generation for identical prompt")
+            try:
+                # 多等一小段时间，让刚好在截止时间完成或超时的生成把结果/异常传过来
+                return future.result(timeout=max(deadline - time.monotonic(), 0) + FOLLOWER_GRACE), False
+            except FutureTimeoutError:
+                raise LLMTimeoutError(f"LLM generation did not finish within {self.timeout}s") from None
+
+        try:
+            if not self._semaphore.acquire(timeout=max(deadline - time.monotonic(), 0)):
+                raise LLMTimeoutError(f"No LLM generation slot became free within {self.timeout}s")
+            try:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise LLMTimeoutError(f"LLM generation did not finish within {self.timeout}s")
+                content = self._generate(messages, remaining)
+            finally:
+                self._semaphore.release()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(content)
+            return content, True
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    # timeout 为距截止时间剩余的秒数，超时应抛出 LLMTimeoutError
+    def _generate(self, messages, timeout):
+        raise NotImplementedError
+
+
+class OllamaBackend(LLMBackend):
+    def __init__(self, model="llama3.1", host=None, max_concurrency=2, timeout=120.0):
+        super().__init__(max_concurrency, timeout)
+        self.model = model
+        self.host = host
+
+    def _generate(self, messages, timeout):
+        # ollama 只在第一次生成时才导入，避免拖慢启动
+        import httpx
+        import ollama
+
+        # 每次生成按剩余时间创建客户端，ollama 的 chat() 不支持单次请求的超时
+        client = ollama.Client(host=self.host, timeout=timeout)
+        try:
+            response = client.chat(model=self.model, messages=messages)
+        except httpx.TimeoutException:
+            raise LLMTimeoutError(f"ollama did not respond within {self.timeout}s") from None
+        return response['message']['content']
+
+
+# 进程内的假后端，不依赖模型服务，用于测试和基准测试
+class FakeBackend(LLMBackend):
+    def __init__(self, reply="&&&fake feedback&&&", delay=0.0, max_concurrency=2, timeout=120.0):
+        super().__init__(max_concurrency, timeout)
+        self.reply = reply
+        self.delay = delay
+        self.calls = 0
+
+    def _generate(self, messages, timeout):
+        with self._lock:
+            self.calls += 1
+        if self.delay > timeout:
+            time.sleep(timeout)
+            raise LLMTimeoutError(f"fake generation did not finish within {self.timeout}s")
+        if self.delay:
+            time.sleep(self.delay)
+        return self.reply
+
+
+BACKENDS = {
+    "ollama": OllamaBackend,
+    "fake": FakeBackend,
+}
+
+
+def create_backend_from_env():
+    name = os.environ.get("STUDYPLAN_LLM_BACKEND", "ollama")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend: {name} (expected one of {', '.join(BACKENDS)})")
+
+    max_concurrency = int(os.environ.get("STUDYPLAN_LLM_CONCURRENCY", "2"))
+    timeout = float(os.environ.get("STUDYPLAN_LLM_TIMEOUT", "120"))
+    if name == "ollama":
+        return OllamaBackend(model=os.environ.get("STUDYPLAN_LLM_MODEL", "llama3.1"),
+                             host=os.environ.get("STUDYPLAN_LLM_HOST"),
+                             max_concurrency=max_concurrency, timeout=timeout)
+    return BACKENDS[name](max_concurrency=max_concurrency, timeout=timeout)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend_from_env()
+        return _backend
+
+
+def set_backend(backend):
+    global _backend
+    with _backend_lock:
+        _backend = backend
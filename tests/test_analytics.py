@@ -0,0 +1,136 @@
+"""统计分析接口：JSON 结果、Arrow/Parquet 编码以及参数校验。"""
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backdb  # noqa: E402
+import llm_backend  # noqa: E402
+
+
+def task(task_id, status="Pending"):
+    return {"task_id": task_id, "content": task_id, "status": status, "comments": [], "feedbacks": []}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(backdb, "DB_PATH", str(tmp_path / "file.db"))
+    monkeypatch.setattr(llm_backend, "_backend", llm_backend.FakeBackend())
+
+    with TestClient(backdb.app) as client:
+        client.post("/add_plan", json={"plan_id": "p1", "title": "t", "goal": "g", "resources": {}, "weeks": [
+            {"week": 1, "days": [{"day": 1, "tasks": [task("week1_day1_task1", "Completed"),
+                                                      task("week1_day1_task2")]},
+                                 {"day": 2, "tasks": [task("week1_day2_task1", "Completed")]}]},
+            {"week": 2, "days": [{"day": 1, "tasks": []}]},
+        ]})
+        client.post("/add_plan", json={"plan_id": "p2", "title": "t", "goal": "g", "resources": {}, "weeks": [
+            {"week": 1, "days": [{"day": 1, "tasks": [task("week1_day1_task1")]}]},
+        ]})
+
+        for plan_id, comments in (("p1", 3), ("p2", 1)):
+            for i in range(comments):
+                client.post("/submit_comment", json={"plan_id": plan_id, "task_id": "week1_day1_task1",
+                                                     "comment": f"comment {i}"})
+
+        for plan_id, task_id, comment in (("p1", "week1_day1_task1", "a"), ("p1", "week1_day1_task1", "b"),
+                                          ("p1", "week1_day2_task1", "c")):
+            client.post("/get_feedback", json={"plan_id": plan_id, "task_id": task_id, "comment": comment})
+
+        yield client
+
+
+def test_task_completion_includes_weeks_without_tasks(client):
+    response = client.get("/analytics/task_completion")
+
+    assert response.status_code == 200
+    assert response.json()["task_completion"] == [
+        {"plan_id": "p1", "week": 1, "total_tasks": 3, "completed_tasks": 2},
+        {"plan_id": "p1", "week": 2, "total_tasks": 0, "completed_tasks": 0},
+        {"plan_id": "p2", "week": 1, "total_tasks": 1, "completed_tasks": 0},
+    ]
+
+
+def test_plan_id_filter(client):
+    rows = client.get("/analytics/task_completion", params={"plan_id": "p2"}).json()["task_completion"]
+    assert [row["plan_id"] for row in rows] == ["p2"]
+
+    assert client.get("/analytics/feedback_requests", params={"plan_id": "missing"}).json() == {
+        "feedback_requests": []}
+
+
+@pytest.mark.parametrize("interval", ["day", "week", "month"])
+def test_comment_volume(client, interval):
+    rows = client.get("/analytics/comment_volume", params={"interval": interval}).json()["comment_volume"]
+
+    assert sorted((row["plan_id"], row["comments"]) for row in rows) == [("p1", 3), ("p2", 1)]
+    period = datetime.fromisoformat(rows[0]["period"])
+    assert (period.hour, period.minute, period.second) == (0, 0, 0)
+    if interval == "month":
+        assert period.day == 1
+
+
+def test_feedback_requests(client):
+    rows = client.get("/analytics/feedback_requests").json()["feedback_requests"]
+
+    assert [(row["plan_id"], row["task_id"], row["feedback_requests"]) for row in rows] == [
+        ("p1", "week1_day1_task1", 2),
+        ("p1", "week1_day2_task1", 1),
+    ]
+    assert all(row["last_requested_at"] for row in rows)
+
+
+@pytest.mark.parametrize("path", ["/analytics/task_completion", "/analytics/comment_volume",
+                                  "/analytics/feedback_requests"])
+def test_arrow_and_parquet_match_json(client, path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    name = path.rsplit("/", 1)[1]
+    expected = client.get(path).json()[name]
+
+    arrow = client.get(path, params={"format": "arrow"})
+    assert arrow.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    arrow_rows = pa.ipc.open_stream(arrow.content).read_all().to_pylist()
+
+    parquet = client.get(path, params={"format": "parquet"})
+    assert parquet.headers["content-type"] == "application/vnd.apache.parquet"
+    parquet_rows = pq.read_table(io.BytesIO(parquet.content)).to_pylist()
+
+    for rows in (arrow_rows, parquet_rows):
+        assert [{key: value.isoformat() if isinstance(value, datetime) else value
+                 for key, value in row.items()} for row in rows] == expected
+
+
+def test_bad_format_is_rejected(client):
+    response = client.get("/analytics/task_completion", params={"format": "csv"})
+    assert response.status_code == 400
+
+
+def test_bad_interval_is_rejected(client):
+    response = client.get("/analytics/comment_volume", params={"interval": "year"})
+    assert response.status_code == 400
+
+
+def test_coalesced_feedback_requests_are_all_counted(client, monkeypatch):
+    backend = llm_backend.FakeBackend(delay=0.3)
+    monkeypatch.setattr(llm_backend, "_backend", backend)
+    payload = {"plan_id": "p2", "task_id": "week1_day1_task1", "comment": "same question"}
+
+    with ThreadPoolExecutor(8) as pool:
+        statuses = list(pool.map(lambda _: client.post("/get_feedback", json=payload).status_code, range(8)))
+
+    assert statuses == [200] * 8
+    assert backend.calls == 1
+
+    plan = client.get("/get_plan/p2").json()
+    assert len(plan["weeks"][0]["days"][0]["tasks"][0]["feedbacks"]) == 1
+
+    rows = client.get("/analytics/feedback_requests", params={"plan_id": "p2"}).json()["feedback_requests"]
+    assert [(row["task_id"], row["feedback_requests"]) for row in rows] == [("week1_day1_task1", 8)]
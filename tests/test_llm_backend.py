@@ -0,0 +1,123 @@
+"""LLM 后端：相同请求合并、异常共享、并发上限和超时。"""
+import os
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_backend import FakeBackend, LLMBackend, LLMTimeoutError, OllamaBackend  # noqa: E402
+
+CLIENTS = 10
+
+
+def messages(content):
+    return [{"role": "user", "content": content}]
+
+
+def run_concurrently(func, args):
+    with ThreadPoolExecutor(len(args)) as pool:
+        return list(pool.map(func, args))
+
+
+def test_identical_prompts_share_one_generation():
+    backend = FakeBackend(delay=0.2)
+
+    results = run_concurrently(backend.generate, [messages("same")] * CLIENTS)
+
+    assert backend.calls == 1
+    assert {content for content, _ in results} == {backend.reply}
+    assert sum(leader for _, leader in results) == 1
+
+
+def test_leader_exception_reaches_every_follower():
+    class FailingBackend(LLMBackend):
+        def _generate(self, messages, timeout):
+            time.sleep(0.2)
+            raise RuntimeError("model server down")
+
+    backend = FailingBackend()
+
+    def call(prompt):
+        with pytest.raises(RuntimeError, match="model server down"):
+            backend.chat(prompt)
+        return True
+
+    assert all(run_concurrently(call, [messages("same")] * CLIENTS))
+    assert backend._inflight == {}
+
+
+def test_max_concurrency_limits_overlapping_generations():
+    class TrackingBackend(FakeBackend):
+        active = 0
+        peak = 0
+        counter_lock = threading.Lock()
+
+        def _generate(self, messages, timeout):
+            with self.counter_lock:
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            try:
+                return super()._generate(messages, timeout)
+            finally:
+                with self.counter_lock:
+                    self.active -= 1
+
+    backend = TrackingBackend(delay=0.05, max_concurrency=2)
+
+    run_concurrently(backend.chat, [messages(f"question {i}") for i in range(CLIENTS)])
+
+    assert backend.calls == CLIENTS
+    assert backend.peak == 2
+
+
+def outcome(backend, prompt):
+    try:
+        return backend.chat(prompt)
+    except LLMTimeoutError:
+        return "timeout"
+
+
+def test_queued_leader_and_followers_share_one_deadline():
+    backend = FakeBackend(reply="ok", delay=0.2, max_concurrency=1, timeout=0.5)
+
+    # "busy" 先占住唯一的名额；"same" 的发起者排队约 0.2s 后生成 0.2s，仍在同一个 0.5s 截止时间内
+    with ThreadPoolExecutor(3) as pool:
+        busy = pool.submit(outcome, backend, messages("busy"))
+        time.sleep(0.05)
+        same = [pool.submit(outcome, backend, messages("same")) for _ in range(2)]
+
+    assert busy.result() == "ok"
+    assert [future.result() for future in same] == ["ok", "ok"]
+    assert backend.calls == 2
+
+
+def test_generation_past_deadline_times_out_leader_and_followers():
+    backend = FakeBackend(reply="ok", delay=0.3, max_concurrency=1, timeout=0.4)
+
+    # 排队约 0.25s 后只剩约 0.15s，不够生成 0.3s；发起者和合并进来的请求都应超时
+    with ThreadPoolExecutor(3) as pool:
+        busy = pool.submit(outcome, backend, messages("busy"))
+        time.sleep(0.05)
+        same = [pool.submit(outcome, backend, messages("same")) for _ in range(2)]
+
+    assert busy.result() == "ok"
+    assert [future.result() for future in same] == ["timeout", "timeout"]
+
+
+def test_ollama_http_timeout_becomes_llm_timeout():
+    pytest.importorskip("ollama")
+
+    # 只接受连接、从不响应的服务器
+    with socket.socket() as server:
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        host = "http://127.0.0.1:%d" % server.getsockname()[1]
+
+        backend = OllamaBackend(host=host, timeout=0.5)
+        with pytest.raises(LLMTimeoutError):
+            backend.chat(messages("hello"))
@@ -0,0 +1,85 @@
+"""多 worker 部署：N 个 uvicorn worker 共用同一个数据库文件，并发读写后所有写入都应保留。"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKERS = 4
+WRITES = 40
+READS = 40
+
+pytest.importorskip("fcntl", reason="多 worker 模式依赖 fcntl")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def request(method, url, payload=None, timeout=30):
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return resp.status, json.loads(resp.read())
+
+
+@pytest.fixture
+def server(tmp_path):
+    port = free_port()
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    env["STUDYPLAN_DB"] = str(tmp_path / "file.db")
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "backdb:app", "--port", str(port),
+                             "--workers", str(WORKERS), "--log-level", "warning"],
+                            cwd=tmp_path, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                request("GET", base_url + "/get_plans", timeout=1)
+                break
+            except OSError:
+                if proc.poll() is not None or time.monotonic() > deadline:
+                    pytest.fail("server did not start")
+                time.sleep(0.05)
+        yield base_url
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def test_concurrent_writes_and_reads_across_workers(server):
+    weeks = [{"week": 1, "days": [{"day": 1, "tasks": []}]}]
+    status, _ = request("POST", server + "/add_plan",
+                        {"plan_id": "p", "title": "t", "goal": "g", "weeks": weeks, "resources": {}})
+    assert status == 200
+
+    def add_task(i):
+        return request("POST", server + "/add_task",
+                       {"plan_id": "p", "task_id": f"week1_day1_task{i}", "task_content": f"content {i}"})[0]
+
+    def get_plan(_):
+        return request("GET", server + "/get_plan/p")[0]
+
+    with ThreadPoolExecutor(16) as pool:
+        futures = [pool.submit(add_task, i) for i in range(WRITES)]
+        futures += [pool.submit(get_plan, i) for i in range(READS)]
+        statuses = [future.result() for future in futures]
+
+    assert set(statuses) == {200}
+
+    _, plan = request("GET", server + "/get_plan/p")
+    task_ids = {task["task_id"] for task in plan["weeks"][0]["days"][0]["tasks"]}
+    assert task_ids == {f"week1_day1_task{i}" for i in range(WRITES)}
+
+    _, history = request("GET", server + "/get_operation_history/p")
+    assert sum(op["operation_type"] == "add_task" for op in history["operation_history"]) == WRITES